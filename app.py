@@ -1,15 +1,38 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import pandas as pd
+import numpy as np
 import os
 import bcrypt
+import hashlib
+import csv
+import io
 import json
+import orjson
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
 from dotenv import load_dotenv
+from openpyxl import load_workbook
 from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler
 
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # fall back to openpyxl's streaming reader
+    CalamineWorkbook = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather
+    import pyarrow.ipc
+except ImportError:  # every process then parses the Excel file itself
+    pa = None
+
 # Load environment variables
 load_dotenv()
 
@@ -23,13 +46,40 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 
 # Data source configuration
 EXCEL_FILE_PATH = os.path.join('sample_data', 'input.xlsx')
+SNAPSHOT_FILE_PATH = os.path.join('sample_data', 'input.feather')
+
+# File watcher configuration
+RELOAD_DEBOUNCE_SECONDS = float(os.getenv('RELOAD_DEBOUNCE_SECONDS', '0.5'))
+USE_POLLING_OBSERVER = os.getenv('USE_POLLING_OBSERVER', 'false').lower() == 'true'
+POLLING_INTERVAL_SECONDS = float(os.getenv('POLLING_INTERVAL_SECONDS', '60'))
+
+# Only the process with WORKER_MASTER=true runs the file watcher; other server
+# workers notice changes by checking the file's mtime at most every RELOAD_CHECK_SECONDS
+WORKER_MASTER = os.getenv('WORKER_MASTER', 'true').lower() == 'true'
+RELOAD_CHECK_SECONDS = float(os.getenv('RELOAD_CHECK_SECONDS', '1'))
+
+# Set on server workers when reloader.py is running: they then load only the
+# snapshot it publishes, and read the Excel file only until one exists
+USE_SNAPSHOT_FILE = os.getenv('USE_SNAPSHOT_FILE', 'false').lower() == 'true'
+
+# Password hashing configuration (the built-in accounts are demo accounts,
+# so a low bcrypt cost keeps startup fast; raise it for real credentials)
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '4'))
+
+def password_digest(password):
+    """SHA-256 a password so plaintext is never kept in the verification cache"""
+    return hashlib.sha256(password.encode('utf-8')).hexdigest().encode('ascii')
+
+def hash_password(password):
+    """Hash a password for the user store"""
+    return bcrypt.hashpw(password_digest(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
 
 # In-memory user store (you can extend this to use a simple JSON file)
 users = [
     {
         'id': 1,
         'username': 'admin',
-        'password': bcrypt.hashpw('Admin@123'.encode('utf-8'), bcrypt.gensalt()).decode('utf-8'),
+        'password': hash_password('Admin@123'),
         'role': 'admin',
         'email': 'admin@example.com',
         'full_name': 'System Administrator'
@@ -37,7 +87,7 @@ users = [
     {
         'id': 2,
         'username': 'viewer',
-        'password': bcrypt.hashpw('Viewer@123'.encode('utf-8'), bcrypt.gensalt()).decode('utf-8'),
+        'password': hash_password('Viewer@123'),
         'role': 'viewer',
         'email': 'viewer@example.com',
         'full_name': 'System Viewer'
@@ -47,140 +97,514 @@ users = [
 # Initialize JWT
 jwt = JWTManager(app)
 
+# Everything derived from one load of the Excel file. Reloads build a new
+# snapshot and rebind jobs_snapshot in one step; requests read it once.
+JobSnapshot = namedtuple('JobSnapshot', [
+    'jobs', 'frame', 'status_index', 'priority_index', 'metrics', 'last_updated', 'version', 'source_mtime'
+])
+
 # Global variables
-jobs_data = []
-last_updated = None
+jobs_snapshot = JobSnapshot([], None, {}, {}, {}, None, 0, None)
+next_mtime_check = 0.0
+_data_lock = threading.Lock()
+reload_in_progress = threading.Event()
+reload_pending = threading.Event()
+_reload_guard = threading.Lock()
+
+EMPTY_POSITIONS = np.array([], dtype=np.intp)
+
+# Filter values that can match a job; anything else short-circuits to an empty result
+VALID_STATUSES = {'completed', 'running', 'failed', 'delayed'}
+STATUS_NAMES = np.array(['failed', 'running', 'delayed', 'completed'], dtype=object)  # indexed by _status_code
+VALID_PRIORITIES = {'high', 'normal', 'low'}
+
+# CSV export headers for the job columns, and how many rows go in each streamed chunk
+CSV_EXPORT_COLUMNS = {
+    'jobName': 'Job Name',
+    'startTime': 'Start Time',
+    'endTime': 'End Time',
+    'duration': 'Duration',
+    'status': 'Status',
+    'dependency': 'Dependencies',
+    'priority': 'Priority',
+    'description': 'Description'
+}
+CSV_EXPORT_CHUNK_ROWS = 1000
+CSV_EXPORT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Columns read from the Excel file, plus the fields derived from them at load time
+SOURCE_COLUMNS = ['id', 'jobName', 'startTime', 'endTime', 'dependency', 'description', 'priority']
+JOB_COLUMNS = SOURCE_COLUMNS + ['status', 'duration']
+# Snapshots written by an older version may lack some of these; they are then ignored
+SNAPSHOT_COLUMNS = JOB_COLUMNS + ['_search_blob', '_status_code']
 
 # Utility functions
-def load_jobs_from_excel():
+def load_jobs_from_excel(startup=False):
     """Load jobs data from Excel file"""
-    global jobs_data, last_updated
+    # Serialize loads so an older parse can never be published over a newer one
+    with _data_lock:
+        source = get_data_source(startup)
+        # Stat before reading, so a write that lands mid-read is still seen as a change
+        source_mtime = get_mtime(source)
+        
+        if source == SNAPSHOT_FILE_PATH:
+            df = read_snapshot_frame()
+        else:
+            excel_signature = get_file_signature(EXCEL_FILE_PATH)
+            df = read_jobs_frame()
+            if WORKER_MASTER and pa is not None:
+                write_snapshot_frame(df, excel_signature)
+        
+        set_jobs_frame(df, source_mtime)
+
+def get_mtime(path):
+    """Get a file's modification time, or None if it doesn't exist"""
     try:
-        if not os.path.exists(EXCEL_FILE_PATH):
-            print(f"Excel file not found at {EXCEL_FILE_PATH}")
-            jobs_data = []
-            last_updated = datetime.now()
-            return
-        
-        df = pd.read_excel(EXCEL_FILE_PATH)
-        jobs = []
-        
-        for index, row in df.iterrows():
-            job = {
-                'id': f"{row['jobName']}_{index}_{datetime.now().timestamp()}",
-                'jobName': str(row['jobName']).strip() if pd.notna(row['jobName']) else '',
-                'startTime': str(row['startTime']).strip() if pd.notna(row['startTime']) else '',
-                'endTime': str(row['endTime']).strip() if pd.notna(row['endTime']) else '',
-                'dependency': str(row['dependency']).strip() if pd.notna(row['dependency']) else '',
-                'description': str(row['description']).strip() if pd.notna(row['description']) else '',
-                'priority': str(row['priority']).strip() if pd.notna(row['priority']) else 'normal'
-            }
-            jobs.append(process_job_data(job))
-        
-        jobs_data = jobs
-        last_updated = datetime.now()
-        print(f"Loaded {len(jobs)} jobs from Excel file")
-        
-    except Exception as e:
-        print(f"Error loading Excel file: {str(e)}")
-        jobs_data = []
-        last_updated = datetime.now()
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def get_file_signature(path):
+    """Get a file's modification time and size as a string, or None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
 
-def process_job_data(job):
-    """Process job data and calculate derived fields"""
-    start_time = parse_datetime(job['startTime'])
-    end_time = parse_datetime(job['endTime'])
+def get_data_source(startup=False):
+    """Pick the file to load: the Feather snapshot where it can be trusted, else the Excel file"""
+    if pa is None:
+        return EXCEL_FILE_PATH
     
-    job['status'] = determine_status(start_time, end_time)
-    job['duration'] = calculate_duration(start_time, end_time)
-    job['startTimeParsed'] = start_time
-    job['endTimeParsed'] = end_time
+    if not WORKER_MASTER:
+        if USE_SNAPSHOT_FILE and os.path.exists(SNAPSHOT_FILE_PATH):
+            return SNAPSHOT_FILE_PATH
+        return EXCEL_FILE_PATH
     
-    return job
+    # The watching process parses the workbook after every change; only a restart
+    # may reuse the snapshot, and only one written from the Excel file as it is now
+    if startup and snapshot_matches_excel():
+        return SNAPSHOT_FILE_PATH
+    return EXCEL_FILE_PATH
 
-def parse_datetime(datetime_str):
-    """Parse datetime string to datetime object"""
-    if not datetime_str or datetime_str.strip() == '':
-        return None
+def snapshot_matches_excel():
+    """Check whether the snapshot was written from the current Excel file"""
+    signature = get_file_signature(EXCEL_FILE_PATH)
+    if signature is None:
+        return False
+    
     try:
-        # Try different datetime formats
-        formats = [
-            '%Y-%m-%dT%H:%M:%S',
-            '%Y-%m-%d %H:%M:%S',
-            '%Y-%m-%d',
-            '%m/%d/%Y %H:%M:%S',
-            '%m/%d/%Y'
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(datetime_str.strip(), fmt)
-            except ValueError:
-                continue
-        
-        # If none of the formats work, try pandas parsing
-        return pd.to_datetime(datetime_str.strip())
+        with pa.memory_map(SNAPSHOT_FILE_PATH) as source:
+            schema = pa.ipc.open_file(source).schema
+    except Exception:  # missing or unreadable; parse the Excel file instead
+        return False
+    
+    metadata = schema.metadata or {}
+    return metadata.get(b'excel_signature') == signature.encode('ascii') and has_snapshot_columns(schema.names)
+
+def has_snapshot_columns(columns):
+    """Check whether a snapshot carries every column this version builds at load time"""
+    return set(SNAPSHOT_COLUMNS).issubset(columns)
+
+def write_snapshot_frame(df, excel_signature=None):
+    """Publish a parsed jobs frame as a Feather file for the other server processes and later restarts"""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if excel_signature is not None:
+            # Lets a restarted watcher tell whether the snapshot still matches the workbook
+            table = table.replace_schema_metadata({
+                **table.schema.metadata,
+                b'excel_signature': excel_signature.encode('ascii')
+            })
+        temp_path = SNAPSHOT_FILE_PATH + '.tmp'
+        pa.feather.write_feather(table, temp_path, compression='zstd')
+        # Readers only ever see a complete file
+        os.replace(temp_path, SNAPSHOT_FILE_PATH)
+    except Exception as e:
+        print(f"Error writing snapshot file: {str(e)}")
+
+def read_snapshot_frame():
+    """Read the jobs frame published by the file-watching process"""
+    try:
+        df = pa.feather.read_table(SNAPSHOT_FILE_PATH, memory_map=True).to_pandas()
+        if not has_snapshot_columns(df.columns):
+            print("Snapshot file is from an older version, reading the Excel file instead")
+            return read_jobs_frame()
         
+        print(f"Loaded {len(df)} jobs from snapshot file")
+        return df
     except Exception as e:
-        print(f"Error parsing datetime '{datetime_str}': {str(e)}")
-        return None
+        print(f"Error loading snapshot file: {str(e)}")
+        return read_jobs_frame()
 
-def calculate_duration(start_time, end_time):
-    """Calculate duration between start and end times"""
-    if not start_time:
-        return None
-    if not end_time:
-        return 'Running'
+def reload_if_changed():
+    """Start a background reload if the data file changed since it was last loaded"""
+    global next_mtime_check
+    now = time.monotonic()
+    if now < next_mtime_check:
+        return
+    next_mtime_check = now + RELOAD_CHECK_SECONDS
+    
+    # source_mtime only moves once a reload finishes; don't queue another behind it
+    if reload_in_progress.is_set():
+        return
+    
+    if get_mtime(get_data_source()) != jobs_snapshot.source_mtime:
+        threading.Thread(target=request_reload, daemon=True).start()
+
+def request_reload():
+    """Reload the jobs data, coalescing requests that arrive while a reload is running"""
+    with _reload_guard:
+        if reload_in_progress.is_set():
+            reload_pending.set()  # the running reload goes round once more
+            return
+        reload_in_progress.set()
     
+    while True:
+        # A failed load must still reach the flag handling below, or later reloads are dropped
+        try:
+            load_jobs_from_excel()
+        except Exception as e:
+            print(f"Error reloading data: {str(e)}")
+        with _reload_guard:
+            if not reload_pending.is_set():
+                reload_in_progress.clear()
+                return
+            reload_pending.clear()
+
+def read_jobs_frame():
+    """Read the Excel file into a jobs frame, falling back to an empty one"""
     try:
-        duration = end_time - start_time
-        if duration.total_seconds() < 0:
-            return 'Invalid'
-        
-        minutes = int(duration.total_seconds() / 60)
-        hours = minutes // 60
+        if not os.path.exists(EXCEL_FILE_PATH):
+            print(f"Excel file not found at {EXCEL_FILE_PATH}")
+            return build_jobs_frame([])
+        
+        rows = read_excel_rows(EXCEL_FILE_PATH)
+        records = []
+        
+        if rows:
+            # Map header names to column positions once, then index row tuples
+            columns = {str(name).strip(): i for i, name in enumerate(rows[0])}
+            name_col = columns['jobName']
+            start_col = columns['startTime']
+            end_col = columns['endTime']
+            dependency_col = columns['dependency']
+            description_col = columns['description']
+            priority_col = columns['priority']
+            
+            # One timestamp per load keeps ids unique across reloads without a clock call per row
+            loaded_at = datetime.now().timestamp()
+            data_rows = (row for row in rows[1:] if any(cell not in (None, '') for cell in row))
+            for index, row in enumerate(data_rows):
+                job_name = cell_to_str(row[name_col])
+                records.append((
+                    f"{job_name}_{index}_{loaded_at}",
+                    job_name,
+                    cell_to_time(row[start_col]),  # parsed to datetimes column-wise
+                    cell_to_time(row[end_col]),
+                    cell_to_str(row[dependency_col]),
+                    cell_to_str(row[description_col]),
+                    cell_to_str(row[priority_col], 'normal')
+                ))
+        
+        print(f"Loaded {len(records)} jobs from Excel file")
+        return build_jobs_frame(records)
         
-        if hours > 0:
-            return f"{hours}h {minutes % 60}m"
-        return f"{minutes}m"
     except Exception as e:
-        print(f"Error calculating duration: {str(e)}")
-        return 'Invalid'
+        print(f"Error loading Excel file: {str(e)}")
+        return build_jobs_frame([])
+
+def set_jobs_frame(df, source_mtime=None):
+    """Publish a freshly built jobs frame together with its derived views"""
+    global jobs_snapshot
+    statuses = build_index(df['status'])
+    priorities = build_index(df['priority'])
+    
+    jobs_snapshot = JobSnapshot(
+        jobs=frame_to_records(df),
+        frame=df,
+        status_index=statuses,
+        priority_index=priorities,
+        metrics=compute_metrics(df, priorities),
+        last_updated=datetime.now(),
+        version=jobs_snapshot.version + 1,
+        source_mtime=source_mtime
+    )
+    
+    # Cached bodies are keyed on the snapshot version; drop the ones for the old data
+    build_jobs_body.cache_clear()
+
+def compute_metrics(df, priorities):
+    """Compute the dashboard metrics for a freshly loaded jobs frame"""
+    status_codes = df['_status_code'].to_numpy()
+    failed, running, delayed, completed = np.bincount(status_codes, minlength=len(STATUS_NAMES))
+    
+    # Calculate average duration (completed jobs always have both times)
+    avg_duration = 0
+    if completed:
+        completed_mask = status_codes == 3
+        durations = (df['endTime'] - df['startTime']).dt.total_seconds().to_numpy()[completed_mask]
+        avg_duration = durations.mean() / 60  # Convert to minutes
+    
+    return {
+        'total': len(df),
+        'completed': int(completed),
+        'running': int(running),
+        'failed': int(failed),
+        'delayed': int(delayed),
+        'avgRunTimeMinutes': int(avg_duration),
+        'priorityDistribution': {
+            'high': len(priorities.get('high', EMPTY_POSITIONS)),
+            'normal': len(priorities.get('normal', EMPTY_POSITIONS)),
+            'low': len(priorities.get('low', EMPTY_POSITIONS))
+        }
+    }
+
+def build_jobs_frame(records):
+    """Build the jobs DataFrame and derive status and duration column-wise"""
+    df = pd.DataFrame(records, columns=SOURCE_COLUMNS)
+    
+    start_time = pd.to_datetime(df['startTime'], format='mixed', errors='coerce')
+    end_time = pd.to_datetime(df['endTime'], format='mixed', errors='coerce')
+    duration_seconds = (end_time - start_time).dt.total_seconds()
+    
+    status_code = np.select(
+        [start_time.isna(), end_time.isna(), duration_seconds > 2 * 60 * 60],  # 2 hours
+        [0, 1, 2],
+        default=3
+    ).astype(np.int8)
+    df['status'] = STATUS_NAMES[status_code]
+    df['_status_code'] = status_code
+    df['duration'] = format_durations(start_time, end_time, duration_seconds)
+    df['startTime'] = start_time
+    df['endTime'] = end_time
+    
+    # Lowercased text searched by the jobs/export filters, built once per load
+    df['_search_blob'] = (df['jobName'] + '\n' + df['dependency'] + '\n' + df['description']).str.lower()
+    
+    return df
+
+def format_durations(start_time, end_time, duration_seconds):
+    """Format durations as '<h>h <m>m' / '<m>m' strings for a whole column at once"""
+    minutes = np.floor(duration_seconds.fillna(0).clip(lower=0) / 60).astype('int64')
+    hours = minutes // 60
+    hours_text = hours.astype(str) + 'h ' + (minutes % 60).astype(str) + 'm'
+    minutes_text = minutes.astype(str) + 'm'
+    
+    return np.select(
+        [start_time.isna(), end_time.isna(), duration_seconds < 0, hours > 0],
+        [None, 'Running', 'Invalid', hours_text.astype(object)],
+        default=minutes_text.astype(object)
+    )
+
+def frame_to_records(df):
+    """Convert the jobs DataFrame into JSON-friendly dict records"""
+    df = df[JOB_COLUMNS]  # drop internal columns such as _search_blob
+    records = df.astype(object)
+    
+    records = records.where(df.notna(), None)
+    
+    # orjson encodes datetime natively but not pandas Timestamp; build the values as an
+    # object Series so pandas doesn't infer them back into datetime64
+    for column in ('startTime', 'endTime'):
+        records[column] = pd.Series(
+            [None if pd.isna(value) else value.to_pydatetime() for value in df[column]],
+            index=df.index, dtype=object
+        )
+    
+    return records.to_dict(orient='records')
+
+def build_index(column):
+    """Map each distinct value of a column to the sorted row positions holding it"""
+    return column.groupby(column).indices
+
+def is_valid_filter(value, allowed):
+    """Check whether a status/priority filter value is unset, 'all', or can match a job"""
+    return not value or value == 'all' or value in allowed
+
+def find_job_positions(snapshot, search=None, status=None, priority=None):
+    """Return row positions, in file order, of the jobs matching the filters"""
+    positions = None
+    
+    # Narrow status/priority through the bucket indexes instead of scanning
+    if status and status != 'all':
+        positions = snapshot.status_index.get(status, EMPTY_POSITIONS)
+    
+    if priority and priority != 'all':
+        bucket = snapshot.priority_index.get(priority, EMPTY_POSITIONS)
+        positions = bucket if positions is None else np.intersect1d(positions, bucket, assume_unique=True)
+    
+    if search:
+        blobs = snapshot.frame['_search_blob']
+        if positions is None:
+            return np.flatnonzero(blobs.str.contains(search.lower(), regex=False).to_numpy())
+        if len(positions):
+            positions = positions[blobs.iloc[positions].str.contains(search.lower(), regex=False).to_numpy()]
+    
+    # No filters: a lazy range avoids allocating anything proportional to the job count
+    if positions is None:
+        return range(len(snapshot.jobs))
+    
+    return positions
 
-def determine_status(start_time, end_time):
-    """Determine job status based on start and end times"""
-    if not start_time:
-        return 'failed'
-    if not end_time:
-        return 'running'
+def read_excel_rows(path):
+    """Read the first worksheet as a list of row tuples, header row first"""
+    if CalamineWorkbook is not None:
+        workbook = CalamineWorkbook.from_path(path)
+        return workbook.get_sheet_by_index(0).to_python(skip_empty_area=True)
     
+    # read_only streams the sheet XML instead of building the full cell tree
+    workbook = load_workbook(path, read_only=True, data_only=True)
     try:
-        duration = end_time - start_time
-        if duration.total_seconds() > 2 * 60 * 60:  # 2 hours
-            return 'delayed'
-        return 'completed'
-    except Exception as e:
-        print(f"Error determining status: {str(e)}")
-        return 'failed'
+        return list(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+def cell_to_str(value, default=''):
+    """Convert a raw worksheet cell value to a stripped string"""
+    if value is None or value == '':
+        return default
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # calamine returns every numeric cell as a float
+    return str(value).strip()
+
+def cell_to_time(value):
+    """Pass date and text cells through to the column-wise time parse, stringifying anything else"""
+    # pd.to_datetime reads a bare number as nanoseconds since 1970 and can't read a
+    # datetime.time at all; as strings they parse (or fail) the way text cells do
+    if value is None or isinstance(value, (date, str)):
+        return value
+    return str(value)
+
+@lru_cache(maxsize=256)
+def build_jobs_body(query, version):
+    """Serialize one page of filtered jobs; cached per query until the data reloads"""
+    search, status, priority, page, page_size = query
+    snapshot = jobs_snapshot  # version only keys the cache; always serve the current data
+    
+    # Apply filters through the status/priority indexes
+    matches = find_job_positions(snapshot, search, status, priority)
+    
+    # Apply pagination, materializing records only for the requested page
+    total_count = len(matches)
+    start_idx = (page - 1) * page_size
+    end_idx = start_idx + page_size
+    paginated_jobs = [snapshot.jobs[i] for i in matches[start_idx:end_idx]]
+    
+    return orjson.dumps({
+        'jobs': paginated_jobs,
+        'totalCount': total_count,
+        'lastUpdated': snapshot.last_updated,
+        'dataSource': 'excel'
+    }, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def generate_csv_export(jobs, positions):
+    """Yield the CSV export of the given job rows, CSV_EXPORT_CHUNK_ROWS rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(CSV_EXPORT_COLUMNS), extrasaction='ignore', lineterminator=os.linesep)
+    writer.writerow(CSV_EXPORT_COLUMNS)
+    
+    for count, position in enumerate(positions, 1):
+        job = jobs[position]
+        writer.writerow({
+            **job,
+            'startTime': format_export_time(job['startTime']),
+            'endTime': format_export_time(job['endTime'])
+        })
+        if count % CSV_EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    yield buffer.getvalue()
+
+def format_export_time(value):
+    """Format a job time for the CSV export"""
+    return '' if pd.isna(value) else value.strftime(CSV_EXPORT_DATE_FORMAT)
+
+def ojsonify(obj, status=200):
+    """Build a JSON response with orjson, which encodes datetime and numpy values natively"""
+    return Response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY), status=status, mimetype='application/json')
 
 def get_user_by_username(username):
     """Get user by username"""
     return next((user for user in users if user['username'] == username), None)
 
+@lru_cache(maxsize=256)
+def verify_password(username, digest):
+    """Check a password digest against the stored hash, paying the bcrypt cost once per credential"""
+    user = get_user_by_username(username)
+    return user is not None and bcrypt.checkpw(digest, user['password'].encode('utf-8'))
+
 # File watcher for Excel updates
 class ExcelFileHandler(FileSystemEventHandler):
+    """Reload the jobs data once a burst of file events has settled"""
+    
+    def __init__(self, path=EXCEL_FILE_PATH, delay=RELOAD_DEBOUNCE_SECONDS):
+        super().__init__()
+        self.path = os.path.realpath(path)
+        self.filename = os.path.basename(self.path)
+        self.delay = delay
+        self._timer = None
+        self._timer_lock = threading.Lock()
+    
+    def on_created(self, event):
+        self.handle_write(event, event.src_path)
+    
     def on_modified(self, event):
-        if event.src_path.endswith('input.xlsx'):
-            print("Excel file changed, reloading data...")
-            load_jobs_from_excel()
+        self.handle_write(event, event.src_path)
+    
+    def on_closed(self, event):
+        self.handle_write(event, event.src_path)
+    
+    def on_moved(self, event):
+        # Editors often save to a temporary file and rename it over the original
+        self.handle_write(event, event.dest_path)
+    
+    def handle_write(self, event, path):
+        if not event.is_directory and self.is_watched_file(path):
+            self.schedule_reload()
+    
+    def is_watched_file(self, path):
+        """Check whether an event path is the Excel file, ignoring other files in the folder"""
+        return os.path.basename(path) == self.filename and os.path.realpath(path) == self.path
+    
+    def schedule_reload(self):
+        """Restart the debounce timer so a burst of events triggers one reload"""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.reload)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def reload(self):
+        print("Excel file changed, reloading data...")
+        request_reload()
+
+def start_file_watcher():
+    """Start watching the Excel file (polling works on network shares where native events don't)"""
+    if USE_POLLING_OBSERVER:
+        watcher = PollingObserver(timeout=POLLING_INTERVAL_SECONDS)
+    else:
+        watcher = Observer()
+    watcher.schedule(ExcelFileHandler(), path=os.path.dirname(EXCEL_FILE_PATH), recursive=False)
+    watcher.daemon = True
+    watcher.start()
+    return watcher
 
 # Initialize file watcher
-observer = Observer()
-observer.schedule(ExcelFileHandler(), path=os.path.dirname(EXCEL_FILE_PATH), recursive=False)
-observer.start()
+observer = start_file_watcher() if WORKER_MASTER else None
 
 # Load initial data
-load_jobs_from_excel()
+load_jobs_from_excel(startup=True)
+
+@app.before_request
+def check_for_data_changes():
+    """Pick up Excel changes in processes that don't run the file watcher"""
+    if observer is None:
+        reload_if_changed()
 
 # Routes
 @app.route('/api/auth/login', methods=['POST'])
@@ -195,7 +619,7 @@ def login():
             return jsonify({'error': 'Username and password are required'}), 400
         
         user = get_user_by_username(username)
-        if not user or not bcrypt.checkpw(password.encode('utf-8'), user['password'].encode('utf-8')):
+        if not user or not verify_password(username, password_digest(password)):
             return jsonify({'error': 'Invalid username or password'}), 401
         
         access_token = create_access_token(identity={
@@ -224,40 +648,26 @@ def get_jobs():
         search = request.args.get('search')
         status = request.args.get('status')
         priority = request.args.get('priority')
-        page = int(request.args.get('page', 1))
-        page_size = int(request.args.get('pageSize', 50))
-        
-        filtered_jobs = jobs_data.copy()
-        
-        # Apply search filter
-        if search:
-            search_term = search.lower()
-            filtered_jobs = [job for job in filtered_jobs if
-                search_term in job['jobName'].lower() or
-                search_term in job['dependency'].lower() or
-                (job['description'] and search_term in job['description'].lower())
-            ]
-        
-        # Apply status filter
-        if status and status != 'all':
-            filtered_jobs = [job for job in filtered_jobs if job['status'] == status]
-        
-        # Apply priority filter
-        if priority and priority != 'all':
-            filtered_jobs = [job for job in filtered_jobs if job['priority'] == priority]
-        
-        # Apply pagination
-        total_count = len(filtered_jobs)
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_jobs = filtered_jobs[start_idx:end_idx]
+        try:
+            page = int(request.args.get('page', 1))
+            page_size = int(request.args.get('pageSize', 50))
+        except ValueError:
+            return jsonify({'error': 'page and pageSize must be integers'}), 400
+        
+        if page < 1 or page_size < 1:
+            return jsonify({'error': 'page and pageSize must be positive'}), 400
+        
+        # Unknown filter values can't match, and shouldn't take up response cache slots
+        if not is_valid_filter(status, VALID_STATUSES) or not is_valid_filter(priority, VALID_PRIORITIES):
+            return ojsonify({
+                'jobs': [],
+                'totalCount': 0,
+                'lastUpdated': jobs_snapshot.last_updated,
+                'dataSource': 'excel'
+            })
         
-        return jsonify({
-            'jobs': paginated_jobs,
-            'totalCount': total_count,
-            'lastUpdated': last_updated.isoformat() if last_updated else None,
-            'dataSource': 'excel'
-        })
+        body = build_jobs_body((search, status, priority, page, page_size), jobs_snapshot.version)
+        return Response(body, mimetype='application/json')
     except Exception as e:
         print(f"Error fetching jobs: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -267,46 +677,8 @@ def get_jobs():
 def get_metrics():
     """Get job metrics"""
     try:
-        total = len(jobs_data)
-        completed = sum(1 for job in jobs_data if job['status'] == 'completed')
-        running = sum(1 for job in jobs_data if job['status'] == 'running')
-        failed = sum(1 for job in jobs_data if job['status'] == 'failed')
-        delayed = sum(1 for job in jobs_data if job['status'] == 'delayed')
-        
-        high_priority = sum(1 for job in jobs_data if job['priority'] == 'high')
-        normal_priority = sum(1 for job in jobs_data if job['priority'] == 'normal')
-        low_priority = sum(1 for job in jobs_data if job['priority'] == 'low')
-        
-        # Calculate average duration
-        completed_jobs = [
-            job for job in jobs_data
-            if job['status'] == 'completed' and
-            job['startTimeParsed'] and
-            job['endTimeParsed']
-        ]
-        
-        avg_duration = 0
-        if completed_jobs:
-            total_duration = sum(
-                (job['endTimeParsed'] - job['startTimeParsed']).total_seconds()
-                for job in completed_jobs
-            )
-            avg_duration = total_duration / len(completed_jobs) / 60  # Convert to minutes
-        
-        return jsonify({
-            'total': total,
-            'completed': completed,
-            'running': running,
-            'failed': failed,
-            'delayed': delayed,
-            'avgRunTimeMinutes': int(avg_duration),
-            'priorityDistribution': {
-                'high': high_priority,
-                'normal': normal_priority,
-                'low': low_priority
-            },
-            'lastUpdated': last_updated.isoformat() if last_updated else None
-        })
+        snapshot = jobs_snapshot
+        return ojsonify({**snapshot.metrics, 'lastUpdated': snapshot.last_updated})
     except Exception as e:
         print(f"Error fetching metrics: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -317,10 +689,11 @@ def refresh_data():
     """Force refresh data from Excel file"""
     try:
         load_jobs_from_excel()
+        snapshot = jobs_snapshot
         return jsonify({
             'message': 'Data refreshed successfully',
-            'count': len(jobs_data),
-            'lastUpdated': last_updated.isoformat() if last_updated else None
+            'count': len(snapshot.jobs),
+            'lastUpdated': snapshot.last_updated.isoformat() if snapshot.last_updated else None
         })
     except Exception as e:
         print(f"Error refreshing data: {str(e)}")
@@ -335,44 +708,16 @@ def export_jobs():
         status = request.args.get('status')
         priority = request.args.get('priority')
         
-        filtered_jobs = jobs_data.copy()
-        
         # Apply filters
-        if search:
-            search_term = search.lower()
-            filtered_jobs = [job for job in filtered_jobs if
-                search_term in job['jobName'].lower() or
-                search_term in job['dependency'].lower() or
-                (job['description'] and search_term in job['description'].lower())
-            ]
-        
-        if status and status != 'all':
-            filtered_jobs = [job for job in filtered_jobs if job['status'] == status]
-        
-        if priority and priority != 'all':
-            filtered_jobs = [job for job in filtered_jobs if job['priority'] == priority]
-        
-        # Create CSV data
-        csv_data = []
-        for job in filtered_jobs:
-            csv_data.append({
-                'Job Name': job['jobName'],
-                'Start Time': job['startTime'],
-                'End Time': job['endTime'],
-                'Duration': job['duration'],
-                'Status': job['status'],
-                'Dependencies': job['dependency'],
-                'Priority': job['priority'],
-                'Description': job['description'] or ''
-            })
-        
-        # Convert to DataFrame and export
-        df = pd.DataFrame(csv_data)
-        csv_content = df.to_csv(index=False)
+        snapshot = jobs_snapshot
+        if is_valid_filter(status, VALID_STATUSES) and is_valid_filter(priority, VALID_PRIORITIES):
+            matches = find_job_positions(snapshot, search, status, priority)
+        else:
+            matches = EMPTY_POSITIONS
         
-        from flask import Response
+        # Stream the CSV in chunks rather than building it as one string
         return Response(
-            csv_content,
+            generate_csv_export(snapshot.jobs, matches),
             mimetype='text/csv',
             headers={'Content-Disposition': f'attachment; filename=tidal_jobs_export_{datetime.now().strftime("%Y%m%d")}.csv'}
         )
@@ -386,24 +731,25 @@ def get_alerts():
     """Get alerts for critical jobs"""
     try:
         alerts = []
+        now = datetime.now()
         
-        delayed_jobs = [job for job in jobs_data if job['status'] == 'delayed']
-        failed_jobs = [job for job in jobs_data if job['status'] == 'failed']
+        snapshot = jobs_snapshot
+        job_names = snapshot.frame['jobName']
+        delayed_jobs = job_names.iloc[snapshot.status_index.get('delayed', EMPTY_POSITIONS)].tolist()
+        failed_jobs = job_names.iloc[snapshot.status_index.get('failed', EMPTY_POSITIONS)].tolist()
         
-        # Find long-running jobs (more than 3 hours)
-        long_running_jobs = []
-        for job in jobs_data:
-            if job['status'] == 'running' and job['startTimeParsed']:
-                now = datetime.now()
-                running_time = now - job['startTimeParsed']
-                if running_time.total_seconds() > 3 * 60 * 60:  # 3 hours
-                    long_running_jobs.append(job)
+        # Find long-running jobs (more than 3 hours); running jobs always have a start time
+        running_jobs = snapshot.status_index.get('running', EMPTY_POSITIONS)
+        running_time = now - snapshot.frame['startTime'].iloc[running_jobs]
+        long_running_jobs = job_names.iloc[running_jobs][
+            running_time.dt.total_seconds() > 3 * 60 * 60  # 3 hours
+        ].tolist()
         
         if delayed_jobs:
             alerts.append({
                 'type': 'warning',
                 'message': f'{len(delayed_jobs)} job(s) are running longer than expected',
-                'jobs': [job['jobName'] for job in delayed_jobs],
+                'jobs': delayed_jobs,
                 'severity': 'medium'
             })
         
@@ -411,7 +757,7 @@ def get_alerts():
             alerts.append({
                 'type': 'error',
                 'message': f'{len(failed_jobs)} job(s) have failed to start',
-                'jobs': [job['jobName'] for job in failed_jobs],
+                'jobs': failed_jobs,
                 'severity': 'high'
             })
         
@@ -419,11 +765,11 @@ def get_alerts():
             alerts.append({
                 'type': 'info',
                 'message': f'{len(long_running_jobs)} job(s) have been running for more than 3 hours',
-                'jobs': [job['jobName'] for job in long_running_jobs],
+                'jobs': long_running_jobs,
                 'severity': 'low'
             })
         
-        return jsonify({'alerts': alerts, 'timestamp': datetime.now().isoformat()})
+        return ojsonify({'alerts': alerts, 'timestamp': now})
     except Exception as e:
         print(f"Error fetching alerts: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -442,11 +788,12 @@ def get_config():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    snapshot = jobs_snapshot
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'jobsCount': len(jobs_data),
-        'lastUpdated': last_updated.isoformat() if last_updated else None,
+        'jobsCount': len(snapshot.jobs),
+        'lastUpdated': snapshot.last_updated.isoformat() if snapshot.last_updated else None,
         'excelPath': EXCEL_FILE_PATH,
         'excelExists': os.path.exists(EXCEL_FILE_PATH)
     })
@@ -454,6 +801,6 @@ def health_check():
 if __name__ == '__main__':
     print("🚀 Starting Tidal Dashboard Flask Server...")
     print(f"📁 Monitoring Excel file: {EXCEL_FILE_PATH}")
-    print(f"📊 Loaded {len(jobs_data)} jobs")
+    print(f"📊 Loaded {len(jobs_snapshot.jobs)} jobs")
     print("🌐 Server will be available at: http://localhost:5000")
-    app.run(debug=True, port=5000, host='0.0.0.0') 
\ No newline at end of file
+    app.run(debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true', port=5000, host='0.0.0.0') 
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+File-watching sidecar for multi-worker deployments.
+
+Parses sample_data/input.xlsx whenever it changes and publishes the result as
+sample_data/input.feather. Server workers started from wsgi.py with
+USE_SNAPSHOT_FILE=true read that file instead of each parsing the Excel file
+themselves.
+
+    python reloader.py
+"""
+
+import os
+
+os.environ['WORKER_MASTER'] = 'true'
+
+import app
+
+if __name__ == '__main__':
+    print("Watching for Excel changes; press Ctrl+C to stop")
+    try:
+        app.observer.join()
+    except KeyboardInterrupt:
+        app.observer.stop()
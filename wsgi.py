@@ -0,0 +1,18 @@
+"""
+WSGI entry point for running Tidal Dashboard under a production server.
+
+Linux:
+    gunicorn -w $(nproc) -k gthread --threads 4 -b 0.0.0.0:5000 wsgi:app
+
+Windows:
+    waitress-serve --listen=0.0.0.0:5000 --threads=8 wsgi:app
+"""
+
+import os
+
+# Server workers pick up changes by checking the data file's modification time;
+# with USE_SNAPSHOT_FILE=true they load only the snapshot published by reloader.py;
+# set WORKER_MASTER=true to run the file watcher as well (e.g. single-process waitress)
+os.environ.setdefault('WORKER_MASTER', 'false')
+
+from app import app